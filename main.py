@@ -1,17 +1,119 @@
-from fastapi import FastAPI
-from typing import Optional
-from scraper import scrape_fda_website
+import json
+import logging
+import threading
+import time
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from scraper import DriverPool, iter_device_details, search_fda_devices
+
+# FDA's TPLC data changes at most daily, so repeated queries are served from memory.
+CACHE_TTL_SECONDS = 12 * 60 * 60
+CACHE_MAX_ENTRIES = 256
+
+NO_RESULTS_MESSAGE = "No results found for the given criteria."
+
+# Each entry holds every line of a complete response: the devices, then the status line.
+_cache: Dict[Tuple[str, Optional[str], Optional[int]], Tuple[float, List[Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
 
 app = FastAPI()
 
+def _cache_get(key: Tuple[str, Optional[str], Optional[int]]) -> Optional[List[Dict[str, Any]]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires_at, lines = entry
+        if expires_at < time.monotonic():
+            del _cache[key]
+            return None
+        return lines
+
+def _cache_set(key: Tuple[str, Optional[str], Optional[int]], lines: List[Dict[str, Any]]):
+    with _cache_lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            # Evict the entry closest to expiry, i.e. the oldest one.
+            del _cache[min(_cache, key=lambda k: _cache[k][0])]
+        _cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, lines)
+
+def _to_ndjson(lines: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    for line in lines:
+        yield json.dumps(line).encode() + b"\n"
+
+def _ndjson_response(lines: Iterator[Dict[str, Any]], cache_status: str) -> StreamingResponse:
+    return StreamingResponse(_to_ndjson(lines), media_type="application/x-ndjson", headers={"X-Cache": cache_status})
+
+def _scrape_and_cache(key: Tuple[str, Optional[str], Optional[int]], devices: Iterator[Dict[str, Any]],
+                      failed_links: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Passes devices through as they are scraped, then ends the stream with a status
+    line. Only complete scrapes are cached. `failed_links` is filled in by the scraper
+    when it finishes.
+    """
+    scraped = []
+    try:
+        for device in devices:
+            scraped.append(device)
+            yield device
+    except Exception:
+        # The headers are already sent, so the failure can only be reported in-band.
+        logging.exception("Scrape failed while streaming results.")
+        yield {"status": "error", "message": "The scrape failed before it finished.", "count": len(scraped)}
+        return
+
+    if failed_links:
+        # Pages were skipped, so the result is incomplete and must not be cached.
+        yield {"status": "incomplete", "count": len(scraped), "failed_links": failed_links}
+        return
+    status = {"status": "success", "count": len(scraped)}
+    _cache_set(key, scraped + [status])
+    yield status
+
+@app.on_event("startup")
+def start_driver_pool():
+    # Browsers are kept alive across requests to avoid paying Chrome start-up on every call.
+    app.state.driver_pool = DriverPool()
+
+@app.on_event("shutdown")
+def close_driver_pool():
+    app.state.driver_pool.close()
+
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
 @app.get("/scrape")
-def scrape_data(device_name: str, product_code: Optional[str] = None, since: Optional[int] = 2020):
+def scrape_data(device_name: str, product_code: Optional[str] = None, since: Optional[int] = 2020,
+                concurrency: int = Query(4, ge=1, le=16, description="Number of detail pages fetched in parallel.")):
     """
     Scrapes the FDA's TPLC device search page for device and patient problems.
+
+    Devices are streamed as newline-delimited JSON, one object per line, as soon as
+    each detail page is scraped. The last line is always a status object: "success"
+    (with a message if the search found nothing), "incomplete" with the links that
+    could not be scraped, or "error"; a stream without one was cut off. The search
+    runs before the response starts, so a failed search is an HTTP error instead.
+    Complete results are cached per (device_name, product_code, since) for 12 hours.
     """
-    data = scrape_fda_website(device_name, product_code, since)
-    return data
+    key = (device_name.strip().lower(), (product_code or "").strip().upper() or None, since)
+    lines = _cache_get(key)
+    if lines is not None:
+        return _ndjson_response(iter(lines), "HIT")
+
+    pool = app.state.driver_pool
+    try:
+        search = search_fda_devices(pool, device_name, product_code, since, concurrency)
+    except Exception:
+        logging.exception("FDA device search failed.")
+        raise HTTPException(status_code=500, detail="The FDA device search failed.", headers={"X-Cache": "MISS"})
+
+    if search is None:
+        lines = [{"status": "success", "message": NO_RESULTS_MESSAGE, "count": 0}]
+        _cache_set(key, lines)
+        return _ndjson_response(iter(lines), "MISS")
+
+    links, cookies = search
+    failed_links: List[str] = []
+    scraped = iter_device_details(pool, links, cookies, concurrency, failed_links)
+    return _ndjson_response(_scrape_and_cache(key, scraped, failed_links), "MISS")
@@ -1,5 +1,13 @@
 import logging
-from typing import Optional, List, Dict, Any
+import math
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
+from urllib.parse import parse_qsl, unquote_plus, urlparse, urlunparse
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -9,52 +17,161 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+import httpx
+from lxml import etree, html
 
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
 
-def _extract_problem_data(driver: webdriver.Chrome, header_text: str) -> List[Dict[str, Any]]:
+# URL patterns for resources the scraper never reads: stylesheets, fonts, media
+# and third-party analytics. Images are disabled separately via Chrome prefs.
+_BLOCKED_URL_PATTERNS = [
+    "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp3", "*.mp4", "*.webm", "*.ogg",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*adobedtm.com*", "*dap.digitalgov.gov*", "*siteimprove*",
+]
+
+# Chrome subsystems that a headless scraper doesn't need. --no-zygote relies on
+# --no-sandbox, which is always set as well.
+_CHROME_DISABLE_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-translate",
+    "--no-first-run",
+    "--no-zygote",
+    "--mute-audio",
+    "--disable-features=IsolateOrigins,site-per-process,Translate,BackForwardCache",
+]
+
+# XPath expressions are compiled once here rather than on every page. The header
+# text is passed as an XPath variable, so it never has to be quoted into the expression.
+_PROBLEM_TABLE_XPATH = etree.XPath("//th[normalize-space()=$h]/ancestor::table[1]")
+_DATA_ROWS_XPATH = etree.XPath(".//tr[td]")
+_DEVICE_CELL_XPATH = etree.XPath("//th[normalize-space()='Device']/following-sibling::td")
+_DEVICE_LINKS_XPATH = etree.XPath("//a[contains(@href, 'tplc.cfm?id=')]/@href")
+_NEXT_LINK_XPATH = etree.XPath("//a[@title='Next']")
+
+# Locators used against the live search page.
+_RESULTS_HEADER_LOCATOR = (By.XPATH, "//th[contains(., 'Device Name')]")
+_NEXT_BUTTON_LOCATOR = (By.XPATH, "//a[@title='Next']")
+_RESULTS_COUNT_LOCATOR = (By.CSS_SELECTOR, "#eir-results-number")
+# Returns every device detail link on the page in one round-trip. a.href is the
+# resolved absolute URL, the same value WebElement.get_attribute("href") returns.
+_DEVICE_LINKS_JS = "return Array.from(document.querySelectorAll(\"a[href*='tplc.cfm?id=']\"), a => a.href);"
+
+# Detail page responses worth retrying, and the waits in seconds before each retry.
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+_RETRY_DELAYS = (1, 2, 4)
+_MAX_RETRY_DELAY = 30
+
+# Query parameters that ColdFusion result pages commonly paginate with.
+_PAGINATION_PARAMS = ("start", "startrow", "page", "pagenum")
+
+# A count cell holds digits with optional thousands separators, e.g. " 1,234 ".
+# Commas may appear anywhere, matching the old strip-the-commas-then-isdigit() check.
+_COUNT_RE = re.compile(r"\s*([\d,]*\d[\d,]*)\s*")
+# Numbers in text such as "Records 1 to 50 of 1,234".
+_COUNT_IN_TEXT_RE = re.compile(r"\d[\d,]*")
+
+
+def _parse_count(text: str) -> Optional[int]:
+    """Converts a cell such as '1,234' to an int, or None if it isn't a number."""
+    match = _COUNT_RE.fullmatch(text)
+    return int(match.group(1).replace(",", "")) if match else None
+
+
+def _cell_text(element: html.HtmlElement) -> str:
+    """Returns an element's text with whitespace collapsed, as a browser would render it."""
+    return " ".join(element.text_content().split())
+
+
+def _extract_problem_data(doc: html.HtmlElement, header_text: str) -> List[Dict[str, Any]]:
     """Helper function to extract problem data from a table identified by its header text."""
     problems = []
-    try:
-        # Find the table by locating its specific header text.
-        table = driver.find_element(By.XPATH, f"//th[normalize-space()='{header_text}']/ancestor::table[1]")
-        # Find all data rows within that specific table.
-        rows = table.find_elements(By.XPATH, ".//tbody/tr[td]")
-
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if len(cols) >= 3:
-                try:
-                    link_element = cols[0].find_element(By.TAG_NAME, "a")
-                    problem_name = link_element.text.strip()
-                    maude_link = link_element.get_attribute("href")
-                except NoSuchElementException:
-                    problem_name = cols[0].text.strip()
-                    maude_link = None
-
-                mdr_count_text = cols[1].text.strip().replace(",", "")
-                mdr_count = int(mdr_count_text) if mdr_count_text.isdigit() else None
-
-                event_count_text = cols[2].text.strip().replace(",", "")
-                event_count = int(event_count_text) if event_count_text.isdigit() else None
-
-                problems.append({
-                    "problem_name": problem_name,
-                    "mdr_count": mdr_count,
-                    "event_count": event_count,
-                    "maude_link": maude_link,
-                })
-    except NoSuchElementException:
+    # Find the table by locating its specific header text.
+    tables = _PROBLEM_TABLE_XPATH(doc, h=header_text)
+    if not tables:
         # This is expected if a problem table doesn't exist.
-        pass
+        return problems
+
+    # Find all data rows within that specific table. Browsers insert <tbody> but
+    # raw server HTML may not have one, so match rows at any depth.
+    for row in _DATA_ROWS_XPATH(tables[0]):
+        cols = row.findall("td")
+        if len(cols) >= 3:
+            links = cols[0].findall(".//a")
+            if links:
+                problem_name = _cell_text(links[0])
+                maude_link = links[0].get("href")
+            else:
+                problem_name = _cell_text(cols[0])
+                maude_link = None
+
+            problems.append({
+                "problem_name": problem_name,
+                "mdr_count": _parse_count(cols[1].text_content()),
+                "event_count": _parse_count(cols[2].text_content()),
+                "maude_link": maude_link,
+            })
     return problems
 
 
-def scrape_fda_website(device_name: str, product_code: Optional[str] = None, since: int = 2020):
+def _parse_html(content: Union[str, bytes], url: str, encoding: Optional[str] = None) -> html.HtmlElement:
     """
-    Main function to scrape the FDA website using Selenium.
+    Parses a page with its links made absolute against `url`. `encoding` (e.g. the
+    HTTP charset) overrides any charset declared inside raw `content` bytes.
     """
-    print("Starting scraper with Selenium...")
-    
+    doc = html.fromstring(content, parser=html.HTMLParser(encoding=encoding) if encoding else None)
+    doc.make_links_absolute(url)
+    return doc
+
+
+def _parse_detail_page(page_html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parses a device detail page. Returns None if the page has no problem data, and
+    raises ValueError if it isn't a device detail page at all. See `_parse_html` for
+    `encoding`.
+    """
+    doc = _parse_html(page_html, url, encoding)
+
+    device_cells = _DEVICE_CELL_XPATH(doc)
+    if not device_cells:
+        raise ValueError("no device details on the page")
+    device_name_on_page = _cell_text(device_cells[0])
+
+    device_problems = _extract_problem_data(doc, "Device Problems")
+    patient_problems = _extract_problem_data(doc, "Patient Problems")
+
+    if not (device_problems or patient_problems):
+        return None
+    return {
+        "device_name": device_name_on_page,
+        "device_problems": device_problems,
+        "patient_problems": patient_problems
+    }
+
+
+_chromedriver_path: Optional[str] = None
+_chromedriver_lock = threading.Lock()
+
+
+def _get_chromedriver_path() -> str:
+    """
+    Resolves the chromedriver binary once per process. ChromeDriverManager().install()
+    checks versions over the network, so it should not run for every browser launched.
+    """
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
+
+def _create_driver() -> webdriver.Chrome:
+    """Launches a headless Chrome instance configured for scraping."""
     # Setup Chrome options for headless mode, which is required for an API.
     chrome_options = Options()
     chrome_options.add_argument("--headless")
@@ -62,100 +179,495 @@ def scrape_fda_website(device_name: str, product_code: Optional[str] = None, sin
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--window-size=1920,1080")
+    # Turn off browser features the scraper never uses to cut memory and start-up time.
+    for argument in _CHROME_DISABLE_ARGS:
+        chrome_options.add_argument(argument)
     # Suppress verbose browser logging to keep the console clean.
     chrome_options.add_argument("--log-level=3")
     chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36")
+    # Don't download images; the scraper only reads table text and links.
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    chrome_options.add_argument(f"user-agent={_USER_AGENT}")
+    # Return from driver.get() at DOMContentLoaded instead of waiting for every
+    # subresource; each step below explicitly waits for the element it needs.
+    chrome_options.page_load_strategy = "eager"
 
     # Use webdriver-manager to automatically handle the chromedriver.
-    service = Service(ChromeDriverManager().install())
+    service = Service(_get_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
-    
-    try:
-        # Navigate to the search page
-        driver.get("https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/tplc.cfm")
-        print("Navigated to search page.")
+    # Block the remaining unneeded resources at the network layer.
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+    return driver
 
-        # Use WebDriverWait for reliable interaction.
-        wait = WebDriverWait(driver, 45)
 
-        # --- Search for the device ---
-        print("Searching for device...")
-        try:
-            device_input = wait.until(EC.visibility_of_element_located((By.NAME, "devicename")))
-            device_input.send_keys(device_name)
-        except TimeoutException:
-            logging.error("Timeout while trying to find the device name input. The page might not have loaded correctly.")
-            logging.error("Current page content:\n" + driver.page_source)
-            raise
+def _quit_quietly(driver: webdriver.Chrome):
+    """Quits a driver, logging rather than raising if it is already broken."""
+    try:
+        driver.quit()
+    except Exception:
+        logging.exception("Failed to quit browser.")
 
-        if product_code:
-            driver.find_element(By.NAME, "productcode").send_keys(product_code)
 
-        if since is not None:
-            Select(driver.find_element(By.NAME, "min_report_year")).select_by_value(str(since))
+class DriverPool:
+    """
+    Keeps headless Chrome instances alive between scrapes so that browser start-up
+    is paid once per instance rather than once per request. At most `max_size`
+    drivers are checked out at any time; callers beyond that block until one is returned.
+    """
 
-        driver.find_element(By.NAME, "search").click()
+    def __init__(self, max_size: int = 16):
+        self._idle: "queue.LifoQueue[webdriver.Chrome]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
 
-        # --- Collect device detail links ---
-        print("Waiting for search results...")
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        """Checks out a driver, resetting it to a clean state when it is returned."""
+        self._slots.acquire()
         try:
-            wait.until(EC.presence_of_element_located((By.XPATH, "//th[contains(., 'Device Name')]")))
-        except TimeoutException:
-            print("No results found for the given criteria.")
-            return {"status": "success", "message": "No results found for the given criteria.", "data": []}
+            driver = self._checkout()
 
-        all_links = []
-        print("Collecting device links...")
-        while True:
-            # Find all links in the results table
-            device_links = driver.find_elements(By.XPATH, "//a[contains(@href, 'tplc.cfm?id=')]")
-            for link in device_links:
-                href = link.get_attribute("href")
-                if href and href not in all_links:
-                    all_links.append(href)
-
-            # Check for a "Next" button
             try:
-                next_button = driver.find_element(By.XPATH, "//a[@title='Next']")
-                print("Navigating to next page...")
-                next_button.click()
-                wait.until(EC.staleness_of(next_button)) # Wait for the old button to disappear
-            except NoSuchElementException:
-                break # No more pages
+                yield driver
+            except Exception:
+                # The session may be in an unknown state; don't hand it to anyone else.
+                _quit_quietly(driver)
+                raise
 
-        # --- Scrape each device detail page ---
-        scraped_data = []
-        print(f"Found {len(all_links)} device links. Scraping each page...")
+            if self._closed:
+                _quit_quietly(driver)
+                return
+            try:
+                # Isolate the next user from this one's session.
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+            except Exception:
+                logging.exception("Failed to reset browser. Discarding it.")
+                _quit_quietly(driver)
+                return
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    def _checkout(self) -> webdriver.Chrome:
+        """Returns a working idle driver, replacing any that died while idle, or a new one."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return _create_driver()
+            try:
+                # A cheap round-trip that fails if Chrome crashed or was killed while idle.
+                driver.current_url
+            except Exception:
+                print("Discarding an idle browser that no longer responds.")
+                _quit_quietly(driver)
+                continue
+            return driver
 
-        for i, link in enumerate(all_links):
-            print(f"Scraping page {i+1}/{len(all_links)}: {link}")
-            driver.get(link)
-            
+    def close(self):
+        """Quits all idle drivers. Drivers still in use are quit when they are returned."""
+        self._closed = True
+        while True:
             try:
-                wait.until(EC.visibility_of_element_located((By.XPATH, "//th[normalize-space()='Device']")))
-            except TimeoutException:
-                print(f"Warning: Could not find device details on page {link}. Skipping.")
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _quit_quietly(driver)
+
+
+def _http_client(cookies: List[Dict[str, Any]], concurrency: int) -> httpx.Client:
+    """Creates an HTTP/2 client that carries on the given browser session's cookies."""
+    jar = httpx.Cookies()
+    for cookie in cookies:
+        jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+
+    return httpx.Client(
+        http2=True,
+        headers={"User-Agent": _USER_AGENT},
+        cookies=jar,
+        timeout=45,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=concurrency),
+    )
+
+
+def _retry_delay(response: httpx.Response, default: float) -> float:
+    """Returns how long to wait before retrying, honouring a numeric Retry-After header."""
+    retry_after = response.headers.get("Retry-After", "")
+    return min(int(retry_after), _MAX_RETRY_DELAY) if retry_after.isdigit() else default
+
+
+def _fetch_detail_page(client: httpx.Client, link: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Downloads and parses a single device detail page. Returns whether the page could
+    be read, and the device, or None if it has no problem data. Rate limiting, server
+    errors and connection failures are retried a few times before giving up.
+    """
+    print(f"Scraping page: {link}")
+    for retry_delay in (*_RETRY_DELAYS, None):
+        try:
+            response = client.get(link)
+            if response.status_code in _RETRY_STATUS_CODES and retry_delay is not None:
+                delay = _retry_delay(response, retry_delay)
+                print(f"Got HTTP {response.status_code} for {link}. Retrying in {delay}s...")
+                time.sleep(delay)
+                continue
+            response.raise_for_status()
+            # Parse the raw bytes so that lxml applies the charset from the HTTP header
+            # or, failing that, the one declared in the page itself.
+            return True, _parse_detail_page(response.content, str(response.url), response.charset_encoding)
+        except httpx.TransportError as exc:
+            if retry_delay is not None:
+                print(f"Could not connect for {link} ({exc}). Retrying in {retry_delay}s...")
+                time.sleep(retry_delay)
                 continue
+            print(f"Warning: Could not fetch device details from {link} ({exc}). Skipping.")
+        except httpx.HTTPError as exc:
+            print(f"Warning: Could not fetch device details from {link} ({exc}). Skipping.")
+        except ValueError as exc:
+            print(f"Warning: Could not find device details on page {link} ({exc}). Skipping.")
+        except Exception:
+            logging.exception(f"Failed to scrape {link}. Skipping.")
+        break
+    return False, None
+
+
+def _scrape_detail_page_in_browser(driver: webdriver.Chrome, link: str) -> Optional[Dict[str, Any]]:
+    """
+    Scrapes a single device detail page in the browser. Returns None if the page has no
+    problem data, and raises TimeoutException if the device details never appear.
+    """
+    driver.get(link)
+    WebDriverWait(driver, 45).until(EC.presence_of_element_located((By.XPATH, "//th[normalize-space()='Device']")))
+
+    # Snapshot the page once and parse it in Python rather than querying the
+    # browser element by element.
+    return _parse_detail_page(driver.page_source, driver.current_url)
+
+
+def _scrape_detail_pages_in_browser(pool: DriverPool, links: List[str], concurrency: int,
+                                    failed_links: List[str]) -> List[Dict[str, Any]]:
+    """
+    Scrapes device detail pages in parallel, one Chrome instance per worker thread.
+    Links that could not be scraped are appended to `failed_links`.
+    """
+    link_queue: "queue.Queue[str]" = queue.Queue()
+    for link in links:
+        link_queue.put(link)
+
+    scraped_data = []
+    results_lock = threading.Lock()
+
+    def worker():
+        try:
+            with pool.driver() as driver:
+                while True:
+                    try:
+                        link = link_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    print(f"Scraping page: {link}")
+                    try:
+                        result = _scrape_detail_page_in_browser(driver, link)
+                    except TimeoutException:
+                        print(f"Warning: Could not find device details on page {link}. Skipping.")
+                    except Exception:
+                        logging.exception(f"Failed to scrape {link}. Skipping.")
+                    else:
+                        if result is not None:
+                            with results_lock:
+                                scraped_data.append(result)
+                        continue
+                    with results_lock:
+                        failed_links.append(link)
+        except Exception:
+            # E.g. the browser could not be started. Other workers may still drain the queue.
+            logging.exception("Browser worker failed.")
+
+    workers = [threading.Thread(target=worker) for _ in range(max(1, min(concurrency, len(links))))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    # Whatever is left was never attempted because every worker failed.
+    while True:
+        try:
+            failed_links.append(link_queue.get_nowait())
+        except queue.Empty:
+            break
+    return scraped_data
+
+
+def iter_device_details(pool: DriverPool, links: List[str], cookies: List[Dict[str, Any]],
+                        concurrency: int, failed_links: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Scrapes device detail pages in parallel over plain HTTP, yielding each device as
+    soon as its page is parsed. The detail pages are expected to be server-rendered,
+    so no browser is needed once the search session's cookies are known. If not a
+    single page can be read that way (e.g. the host blocks plain HTTP clients), the
+    pages are scraped in browsers from `pool` instead.
+
+    Once iteration finishes, the links that could not be scraped either way are
+    appended to `failed_links` if it is given.
+    """
+    any_page_read = False
+    http_failed_links = []
+    with _http_client(cookies, concurrency) as client:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {executor.submit(_fetch_detail_page, client, link): link for link in links}
+            for future in as_completed(futures):
+                page_read, result = future.result()
+                if page_read:
+                    any_page_read = True
+                else:
+                    http_failed_links.append(futures[future])
+                if result is not None:
+                    yield result
+        finally:
+            # Don't keep fetching pages nobody will read if the caller stops early, and
+            # don't block the caller on requests already in flight; closing the client
+            # makes those fail fast.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    if links and not any_page_read:
+        print("Warning: No device detail page could be fetched over HTTP. Falling back to the browser.")
+        browser_failed_links: List[str] = []
+        yield from _scrape_detail_pages_in_browser(pool, links, concurrency, browser_failed_links)
+        http_failed_links = browser_failed_links
+
+    if http_failed_links:
+        print(f"Warning: {len(http_failed_links)} device detail pages could not be scraped.")
+    if failed_links is not None:
+        failed_links.extend(http_failed_links)
 
-            device_name_element = driver.find_element(By.XPATH, "//th[normalize-space()='Device']/following-sibling::td")
-            device_name_on_page = device_name_element.text.strip()
 
-            device_problems = _extract_problem_data(driver, "Device Problems")
-            patient_problems = _extract_problem_data(driver, "Patient Problems")
+def _results_page_urls(driver: webdriver.Chrome, page_size: int, page_index: int) -> Optional[List[str]]:
+    """
+    Works out the URLs of the results pages after the current one from the "Next" link
+    and the total result count, or returns None if the page doesn't expose a usable
+    pattern. `page_size` is the number of result links on the current page and
+    `page_index` the 1-based position of the current page.
+    """
+    next_links = driver.find_elements(*_NEXT_BUTTON_LOCATOR)
+    count_elements = driver.find_elements(*_RESULTS_COUNT_LOCATOR)
+    if not next_links or not count_elements or page_size == 0:
+        return None
+
+    next_url = next_links[0].get_attribute("href") or ""
+    # The total is the largest number in text such as "Records 51 to 100 of 300".
+    counts = [int(number.replace(",", "")) for number in _COUNT_IN_TEXT_RE.findall(count_elements[0].text)]
+    if not next_url.startswith("http") or not counts:
+        return None
+    total_results = max(counts)
+
+    parsed = urlparse(next_url)
+    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    current_query = dict(parse_qsl(urlparse(driver.current_url).query, keep_blank_values=True))
+    for param in _PAGINATION_PARAMS:
+        next_value = query.get(param, "")
+        if not next_value.isdigit():
+            continue
+        current_value = current_query.get(param, "")
+        if not current_value.isdigit():
+            # Without the current value (e.g. right after the search form POST) the
+            # step and base can't be told apart; try again from the next page.
+            return None
+        step = int(next_value) - int(current_value)
+        if step <= 0:
+            return None
+
+        # Page-number style advances by one per page; row-offset style advances by
+        # the page size.
+        rows_per_page = page_size if step == 1 else step
+        remaining_pages = math.ceil(total_results / rows_per_page) - page_index
+        if remaining_pages <= 0:
+            return None
+        first_value = int(next_value)
+        return [_with_query_param(next_url, param, value)
+                for value in range(first_value, first_value + remaining_pages * step, step)]
+    return None
+
+
+def _with_query_param(url: str, param: str, value: int) -> str:
+    """
+    Returns `url` with the value of query parameter `param` replaced. Every other pair
+    is kept byte for byte and in order, so the URL matches what the server links to.
+    """
+    parsed = urlparse(url)
+    pairs = parsed.query.split("&")
+    for index, pair in enumerate(pairs):
+        name = pair.split("=", 1)[0]
+        if unquote_plus(name) == param:
+            pairs[index] = f"{name}={value}"
+            break
+    return urlunparse(parsed._replace(query="&".join(pairs)))
+
+
+def _fetch_results_page_links(client: httpx.Client, url: str) -> Tuple[List[str], bool]:
+    """Downloads a results page and returns its device detail links and whether it has a "Next" link."""
+    response = client.get(url)
+    response.raise_for_status()
+    doc = _parse_html(response.content, str(response.url), response.charset_encoding)
+    return [str(href) for href in _DEVICE_LINKS_XPATH(doc)], bool(_NEXT_LINK_XPATH(doc))
+
+
+def _fetch_results_pages(urls: List[str], cookies: List[Dict[str, Any]], concurrency: int) -> Optional[List[str]]:
+    """
+    Fetches results pages in parallel and returns their links in page order, or None
+    if the URL pattern can't be trusted: a page fails or comes back empty, or the last
+    page still links to a next one, meaning the pages were under-counted.
+    """
+    with _http_client(cookies, concurrency) as client, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            pages = list(executor.map(lambda url: _fetch_results_page_links(client, url), urls))
+        except Exception as exc:
+            print(f"Warning: Could not fetch results pages directly ({exc!r}).")
+            return None
+    if not all(links for links, _ in pages):
+        return None
+    if pages[-1][1]:
+        print("Warning: The last results page fetched directly still has a next page.")
+        return None
+    return [link for links, _ in pages for link in links]
 
-            if device_problems or patient_problems:
-                scraped_data.append({
-                    "device_name": device_name_on_page,
-                    "device_problems": device_problems,
-                    "patient_problems": patient_problems
-                })
 
+def _collect_device_links(driver: webdriver.Chrome, device_name: str, product_code: Optional[str],
+                          since: Optional[int], concurrency: int) -> Optional[List[str]]:
+    """Runs the device search and returns every detail page link, or None if there are no results."""
+    # Navigate to the search page
+    driver.get("https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/tplc.cfm")
+    print("Navigated to search page.")
+
+    # Use WebDriverWait for reliable interaction.
+    wait = WebDriverWait(driver, 45)
+
+    # --- Search for the device ---
+    print("Searching for device...")
+    try:
+        device_input = wait.until(EC.visibility_of_element_located((By.NAME, "devicename")))
+        device_input.send_keys(device_name)
+    except TimeoutException:
+        logging.error("Timeout while trying to find the device name input. The page might not have loaded correctly.")
+        logging.error("Current page content:\n" + driver.page_source)
+        raise
+
+    if product_code:
+        driver.find_element(By.NAME, "productcode").send_keys(product_code)
+
+    if since is not None:
+        Select(driver.find_element(By.NAME, "min_report_year")).select_by_value(str(since))
+
+    driver.find_element(By.NAME, "search").click()
+
+    # --- Collect device detail links ---
+    print("Waiting for search results...")
+    try:
+        wait.until(EC.presence_of_element_located(_RESULTS_HEADER_LOCATOR))
+    except TimeoutException:
+        return None
+
+    # A dict is used as an insertion-ordered set so the links stay in result order.
+    all_links: Dict[str, None] = {}
+
+    def collect_current_page() -> Tuple[int, int]:
+        """Adds the links on the current results page. Returns how many were new and how many the page had."""
+        links_before = len(all_links)
+        hrefs = [href for href in driver.execute_script(_DEVICE_LINKS_JS) if href]
+        all_links.update((href, None) for href in hrefs)
+        return len(all_links) - links_before, len(hrefs)
+
+    print("Collecting device links...")
+    new_links, page_size = collect_current_page()
+    if new_links == 0:
+        # Nothing to paginate through, as before the parallel fetch was added.
+        return list(all_links)
+
+    page_index = 1
+    tried_direct_fetch = False
+    while True:
+        # Fetch the remaining pages in parallel if their URLs can be worked out. The
+        # first page's URL often lacks the pagination parameter, so also try the second.
+        if not tried_direct_fetch and page_index <= 2:
+            page_urls = _results_page_urls(driver, page_size, page_index)
+            if page_urls is not None:
+                tried_direct_fetch = True
+                print(f"Fetching {len(page_urls)} more results pages in parallel...")
+                links = _fetch_results_pages(page_urls, driver.get_cookies(), concurrency)
+                if links is not None:
+                    all_links.update((link, None) for link in links)
+                    return list(all_links)
+                print("Falling back to clicking through results pages.")
+
+        # Check for a "Next" button
+        try:
+            next_button = driver.find_element(*_NEXT_BUTTON_LOCATOR)
+            print("Navigating to next page...")
+            next_button.click()
+            wait.until(EC.staleness_of(next_button)) # Wait for the old button to disappear
+            wait.until(EC.presence_of_element_located(_RESULTS_HEADER_LOCATOR))
+        except NoSuchElementException:
+            break # No more pages
+
+        page_index += 1
+        new_links, page_size = collect_current_page()
+        if new_links == 0:
+            # A page with nothing new means pagination is repeating itself.
+            break
+    return list(all_links)
+
+
+def search_fda_devices(pool: DriverPool, device_name: str, product_code: Optional[str] = None,
+                       since: Optional[int] = 2020, concurrency: int = 4) -> Optional[Tuple[List[str], List[Dict[str, Any]]]]:
+    """
+    Runs the device search in a browser from `pool`. Returns the device detail links
+    together with the session cookies needed to fetch them, or None if there are no results.
+    """
+    print("Starting scraper with Selenium...")
+    # The cookies must be read before the driver goes back to the pool,
+    # which clears them.
+    with pool.driver() as driver:
+        all_links = _collect_device_links(driver, device_name, product_code, since, concurrency)
+        if all_links is None:
+            print("No results found for the given criteria.")
+            return None
+        print(f"Found {len(all_links)} device links.")
+        return all_links, driver.get_cookies()
+
+
+def scrape_fda_website(device_name: str, product_code: Optional[str] = None, since: Optional[int] = 2020,
+                       concurrency: int = 4, pool: Optional[DriverPool] = None):
+    """
+    Main function to scrape the FDA website.
+
+    The search runs in a browser taken from `pool` if given; otherwise a temporary
+    pool is used and closed before returning. Further results pages and the device
+    detail pages are fetched over HTTP, `concurrency` at a time.
+    """
+    owns_pool = pool is None
+    if owns_pool:
+        pool = DriverPool()
+
+    try:
+        search = search_fda_devices(pool, device_name, product_code, since, concurrency)
+        if search is None:
+            return {"status": "success", "message": "No results found for the given criteria.", "data": []}
+
+        # --- Scrape each device detail page ---
+        all_links, cookies = search
+        failed_links: List[str] = []
+        scraped_data = list(iter_device_details(pool, all_links, cookies, concurrency, failed_links))
+        if failed_links:
+            return {"status": "success", "data": scraped_data, "failed_links": failed_links}
         return {"status": "success", "data": scraped_data}
 
     finally:
-        print("Closing browser.")
-        driver.quit()
+        if owns_pool:
+            print("Closing browsers.")
+            pool.close()
 
 if __name__ == '__main__':
     results = scrape_fda_website("syringe")
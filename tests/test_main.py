@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    main._cache.clear()
+    main.app.state.driver_pool = None
+    monkeypatch.setattr(main, "search_fda_devices", lambda *args: (["link-1", "link-2"], []))
+    return TestClient(main.app)
+
+
+def test_scrape_is_cached(client, monkeypatch):
+    monkeypatch.setattr(main, "iter_device_details", lambda *args: iter([{"device_name": "A"}]))
+    assert client.get("/scrape", params={"device_name": "syringe"}).headers["X-Cache"] == "MISS"
+    assert client.get("/scrape", params={"device_name": " Syringe"}).headers["X-Cache"] == "HIT"
+
+
+def test_scrape_with_failed_pages_is_not_cached(client, monkeypatch):
+    def scrape_with_failure(pool, links, cookies, concurrency, failed_links):
+        yield {"device_name": "A"}
+        failed_links.append("link-2")
+
+    monkeypatch.setattr(main, "iter_device_details", scrape_with_failure)
+    assert client.get("/scrape", params={"device_name": "syringe"}).headers["X-Cache"] == "MISS"
+    assert client.get("/scrape", params={"device_name": "syringe"}).headers["X-Cache"] == "MISS"
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_scrape_ends_with_status_line(client, monkeypatch):
+    monkeypatch.setattr(main, "iter_device_details", lambda *args: iter([{"device_name": "A"}]))
+    response = client.get("/scrape", params={"device_name": "syringe"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert _lines(response) == [{"device_name": "A"}, {"status": "success", "count": 1}]
+    assert _lines(client.get("/scrape", params={"device_name": "syringe"})) == _lines(response)
+
+
+def test_scrape_without_results(client, monkeypatch):
+    monkeypatch.setattr(main, "search_fda_devices", lambda *args: None)
+    for cache_status in ("MISS", "HIT"):
+        response = client.get("/scrape", params={"device_name": "nothing"})
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["X-Cache"] == cache_status
+        assert _lines(response) == [{"status": "success", "message": main.NO_RESULTS_MESSAGE, "count": 0}]
+
+
+def test_scrape_with_failed_pages_reports_them(client, monkeypatch):
+    def scrape_with_failure(pool, links, cookies, concurrency, failed_links):
+        yield {"device_name": "A"}
+        failed_links.append("link-2")
+
+    monkeypatch.setattr(main, "iter_device_details", scrape_with_failure)
+    assert _lines(client.get("/scrape", params={"device_name": "syringe"}))[-1] == {
+        "status": "incomplete", "count": 1, "failed_links": ["link-2"],
+    }
+
+
+def test_scrape_failing_mid_stream_reports_error(client, monkeypatch):
+    def scrape_then_fail(*args):
+        yield {"device_name": "A"}
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(main, "iter_device_details", scrape_then_fail)
+    response = client.get("/scrape", params={"device_name": "syringe"})
+    assert _lines(response)[-1]["status"] == "error"
+    assert client.get("/scrape", params={"device_name": "syringe"}).headers["X-Cache"] == "MISS"
+
+
+def test_search_failure_is_an_http_error(client, monkeypatch):
+    def failing_search(*args):
+        raise RuntimeError("chrome not reachable")
+
+    monkeypatch.setattr(main, "search_fda_devices", failing_search)
+    response = client.get("/scrape", params={"device_name": "syringe"})
+    assert response.status_code == 500
+    assert response.headers["X-Cache"] == "MISS"
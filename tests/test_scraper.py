@@ -0,0 +1,365 @@
+import httpx
+import pytest
+
+import scraper
+
+SEARCH_URL = "https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/tplc.cfm"
+
+
+class StubElement:
+    def __init__(self, href=None, text=""):
+        self.href = href
+        self.text = text
+
+    def get_attribute(self, name):
+        return self.href if name == "href" else None
+
+
+class StubDriver:
+    """Stands in for a Selenium driver showing a results page."""
+
+    def __init__(self, current_url, next_href=None, count_text=None):
+        self.current_url = current_url
+        self.next_href = next_href
+        self.count_text = count_text
+
+    def find_elements(self, by, value):
+        if (by, value) == scraper._NEXT_BUTTON_LOCATOR:
+            return [StubElement(href=self.next_href)] if self.next_href is not None else []
+        if (by, value) == scraper._RESULTS_COUNT_LOCATOR:
+            return [StubElement(text=self.count_text)] if self.count_text is not None else []
+        return []
+
+
+def test_offset_pagination_one_based():
+    driver = StubDriver(f"{SEARCH_URL}?name=x&start=1", f"{SEARCH_URL}?name=x&start=51", "120 results")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=1) == [
+        f"{SEARCH_URL}?name=x&start=51",
+        f"{SEARCH_URL}?name=x&start=101",
+    ]
+
+
+def test_offset_pagination_zero_based():
+    driver = StubDriver(f"{SEARCH_URL}?start=0", f"{SEARCH_URL}?start=50", "Records 1 to 50 of 120")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=1) == [
+        f"{SEARCH_URL}?start=50",
+        f"{SEARCH_URL}?start=100",
+    ]
+
+
+def test_offset_pagination_from_second_page():
+    driver = StubDriver(f"{SEARCH_URL}?start=50", f"{SEARCH_URL}?start=100", "Records 51 to 100 of 300")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=2) == [
+        f"{SEARCH_URL}?start=100",
+        f"{SEARCH_URL}?start=150",
+        f"{SEARCH_URL}?start=200",
+        f"{SEARCH_URL}?start=250",
+    ]
+
+
+def test_page_number_pagination_uses_total_not_first_number():
+    driver = StubDriver(f"{SEARCH_URL}?page=2", f"{SEARCH_URL}?page=3", "Records 51 to 100 of 300")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=2) == [
+        f"{SEARCH_URL}?page={page}" for page in range(3, 7)
+    ]
+
+
+def test_pagination_keeps_other_query_params_as_sent():
+    query = "devicename=infusion%20pump&productcode=&min_report_year=2020"
+    driver = StubDriver(f"{SEARCH_URL}?{query}&start=1", f"{SEARCH_URL}?{query}&start=51", "120 results")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=1) == [
+        f"{SEARCH_URL}?{query}&start=51",
+        f"{SEARCH_URL}?{query}&start=101",
+    ]
+
+
+def test_pagination_param_in_the_middle_of_the_query():
+    driver = StubDriver(f"{SEARCH_URL}?a=1&page=1&b=", f"{SEARCH_URL}?a=1&page=2&b=", "120 results")
+    assert scraper._results_page_urls(driver, page_size=40, page_index=1) == [
+        f"{SEARCH_URL}?a=1&page=2&b=",
+        f"{SEARCH_URL}?a=1&page=3&b=",
+    ]
+
+
+def test_page_number_pagination_on_last_page():
+    driver = StubDriver(f"{SEARCH_URL}?page=1", f"{SEARCH_URL}?page=2", "40 results")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=1) is None
+
+
+@pytest.mark.parametrize("current_url", [SEARCH_URL, f"{SEARCH_URL}?name=x"])
+def test_missing_param_in_current_url(current_url):
+    # After the search form POST the current URL carries no pagination parameter,
+    # so neither the base nor the step of a "start=50" link can be known.
+    driver = StubDriver(current_url, f"{SEARCH_URL}?start=50", "300 results")
+    assert scraper._results_page_urls(driver, page_size=50, page_index=1) is None
+
+
+@pytest.mark.parametrize("next_href, count_text", [
+    (None, "300 results"),
+    (f"{SEARCH_URL}?start=51", None),
+    (f"{SEARCH_URL}?start=51", "no count"),
+    ("javascript:nextPage()", "300 results"),
+    (f"{SEARCH_URL}?sort=name", "300 results"),
+])
+def test_unusable_pattern(next_href, count_text):
+    driver = StubDriver(f"{SEARCH_URL}?start=1", next_href, count_text)
+    assert scraper._results_page_urls(driver, page_size=50, page_index=1) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,234", 1234),
+    (",12", 12),
+    (" 1 ", 1),
+    ("\xa01", 1),
+    ("7", 7),
+    ("", None),
+    (",", None),
+    ("12a", None),
+    ("n/a", None),
+    ("\u00b2", None),
+])
+def test_parse_count(text, expected):
+    assert scraper._parse_count(text) == expected
+
+
+def _results_page(ids, has_next):
+    links = "".join(f'<tr><td><a href="tplc.cfm?id={i}">Device {i}</a></td></tr>' for i in ids)
+    next_link = '<a title="Next" href="tplc.cfm?start=999">Next</a>' if has_next else ""
+    return f"<html><body><table><tr><th>Device Name</th></tr>{links}</table>{next_link}</body></html>".encode()
+
+
+@pytest.fixture
+def serve_results_pages(monkeypatch):
+    def serve(pages):
+        def handler(request):
+            body = pages[request.url.params["start"]]
+            return httpx.Response(200, content=body) if isinstance(body, bytes) else body
+
+        monkeypatch.setattr(scraper, "_http_client",
+                            lambda cookies, concurrency: httpx.Client(transport=httpx.MockTransport(handler)))
+    return serve
+
+
+def test_fetch_results_pages(serve_results_pages):
+    serve_results_pages({"51": _results_page([1, 2], True), "101": _results_page([3], False)})
+    urls = [f"{SEARCH_URL}?start=51", f"{SEARCH_URL}?start=101"]
+    assert scraper._fetch_results_pages(urls, [], 2) == [
+        "https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/tplc.cfm?id=1",
+        "https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/tplc.cfm?id=2",
+        "https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/tplc.cfm?id=3",
+    ]
+
+
+@pytest.mark.parametrize("last_page", [
+    _results_page([3], True),  # Under-counted: there are more pages.
+    _results_page([], False),  # Over-counted, or the URL pattern is wrong.
+    b"   ",  # lxml raises ParserError on an empty document.
+    httpx.Response(403),
+])
+def test_fetch_results_pages_falls_back(serve_results_pages, last_page):
+    serve_results_pages({"51": _results_page([1, 2], True), "101": last_page})
+    urls = [f"{SEARCH_URL}?start=51", f"{SEARCH_URL}?start=101"]
+    assert scraper._fetch_results_pages(urls, [], 2) is None
+
+
+class FakeDriver:
+    def __init__(self, alive=True, quit_error=None):
+        self.alive = alive
+        self.quit_error = quit_error
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return "about:blank"
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+        if self.quit_error:
+            raise self.quit_error
+
+
+def test_driver_pool_replaces_dead_idle_driver(monkeypatch):
+    fresh = FakeDriver()
+    monkeypatch.setattr(scraper, "_create_driver", lambda: fresh)
+    pool = scraper.DriverPool()
+    dead = FakeDriver(alive=False, quit_error=RuntimeError("already gone"))
+    pool._idle.put(dead)
+
+    with pool.driver() as driver:
+        assert driver is fresh
+    assert dead.quit_called
+
+
+def test_driver_pool_keeps_original_error_when_quit_fails(monkeypatch):
+    broken = FakeDriver(quit_error=RuntimeError("already gone"))
+    monkeypatch.setattr(scraper, "_create_driver", lambda: broken)
+    pool = scraper.DriverPool()
+
+    with pytest.raises(KeyError):
+        with pool.driver():
+            raise KeyError("search failed")
+    assert broken.quit_called
+    assert pool._idle.empty()
+
+
+DETAIL_URL = f"{SEARCH_URL}?id=1"
+
+
+def _detail_page(device_name="Syringe, Piston", problems=(("Leak", "1,234", "5"),)):
+    rows = "".join(f'<tr><td><a href="maude.cfm?p={name}">{name}</a></td><td>{mdrs}</td><td>{events}</td></tr>'
+                   for name, mdrs, events in problems)
+    problem_table = f"<table><tr><th>Device Problems</th><th>MDRs</th><th>Events</th></tr>{rows}</table>" if problems else ""
+    return (f"<html><body><table><tr><th>Device</th><td>{device_name}</td></tr></table>"
+            f"{problem_table}</body></html>").encode()
+
+
+def test_parse_detail_page():
+    assert scraper._parse_detail_page(_detail_page(), DETAIL_URL) == {
+        "device_name": "Syringe, Piston",
+        "device_problems": [{
+            "problem_name": "Leak",
+            "mdr_count": 1234,
+            "event_count": 5,
+            "maude_link": "https://www.accessdata.fda.gov/scripts/cdrh/cfdocs/cfTPLC/maude.cfm?p=Leak",
+        }],
+        "patient_problems": [],
+    }
+
+
+def test_parse_detail_page_without_problem_tables():
+    assert scraper._parse_detail_page(_detail_page(problems=()), DETAIL_URL) is None
+
+
+def test_parse_detail_page_without_device_cell():
+    with pytest.raises(ValueError):
+        scraper._parse_detail_page(b"<html><body><p>Please wait while we check your browser</p></body></html>",
+                                   DETAIL_URL)
+
+
+def _mock_client(handler):
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_fetch_detail_page():
+    client = _mock_client(lambda request: httpx.Response(200, content=_detail_page()))
+    page_read, device = scraper._fetch_detail_page(client, DETAIL_URL)
+    assert page_read
+    assert device["device_name"] == "Syringe, Piston"
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(403),
+    httpx.Response(404),
+    httpx.Response(200, content=b""),
+    httpx.Response(200, content=b"  \n "),
+])
+def test_fetch_detail_page_failure(response):
+    client = _mock_client(lambda request: response)
+    assert scraper._fetch_detail_page(client, DETAIL_URL) == (False, None)
+
+
+@pytest.fixture
+def serve_detail_pages(monkeypatch):
+    """Serves detail pages by id over a mock transport and records browser fallbacks."""
+    browser_calls = []
+
+    def serve(pages):
+        def handler(request):
+            body = pages[request.url.params["id"]]
+            return httpx.Response(200, content=body) if isinstance(body, bytes) else body
+
+        monkeypatch.setattr(scraper, "_http_client", lambda cookies, concurrency: _mock_client(handler))
+        return browser_calls
+
+    def scrape_in_browser(pool, links, concurrency, *args):
+        browser_calls.append(list(links))
+        return [{"device_name": "From browser", "device_problems": [], "patient_problems": []}]
+
+    monkeypatch.setattr(scraper, "_scrape_detail_pages_in_browser", scrape_in_browser)
+    return serve
+
+
+def _detail_links(*ids):
+    return [f"{SEARCH_URL}?id={i}" for i in ids]
+
+
+def test_iter_device_details_reads_over_http(serve_detail_pages):
+    browser_calls = serve_detail_pages({"1": _detail_page("A"), "2": _detail_page("B", problems=())})
+    devices = list(scraper.iter_device_details(None, _detail_links(1, 2), [], 2))
+    assert [device["device_name"] for device in devices] == ["A"]
+    assert browser_calls == []
+
+
+def test_iter_device_details_falls_back_when_no_page_is_read(serve_detail_pages):
+    browser_calls = serve_detail_pages({"1": httpx.Response(403), "2": b"<html><body>Blocked</body></html>"})
+    devices = list(scraper.iter_device_details(None, _detail_links(1, 2), [], 2))
+    assert [device["device_name"] for device in devices] == ["From browser"]
+    assert sorted(browser_calls[0]) == _detail_links(1, 2)
+
+
+def test_iter_device_details_does_not_fall_back_when_some_page_is_read(serve_detail_pages):
+    browser_calls = serve_detail_pages({"1": httpx.Response(403), "2": _detail_page("B")})
+    devices = list(scraper.iter_device_details(None, _detail_links(1, 2), [], 2))
+    assert [device["device_name"] for device in devices] == ["B"]
+    assert browser_calls == []
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(scraper.time, "sleep", delays.append)
+    return delays
+
+
+def test_fetch_detail_page_retries_rate_limiting_and_server_errors(no_sleep):
+    responses = iter([httpx.Response(429, headers={"Retry-After": "7"}), httpx.Response(503),
+                      httpx.Response(200, content=_detail_page())])
+    client = _mock_client(lambda request: next(responses))
+    page_read, device = scraper._fetch_detail_page(client, DETAIL_URL)
+    assert page_read and device["device_name"] == "Syringe, Piston"
+    assert no_sleep == [7, 2]
+
+
+def test_fetch_detail_page_gives_up_after_retries(no_sleep):
+    client = _mock_client(lambda request: httpx.Response(503))
+    assert scraper._fetch_detail_page(client, DETAIL_URL) == (False, None)
+    assert no_sleep == list(scraper._RETRY_DELAYS)
+
+
+def test_iter_device_details_reports_failed_links(serve_detail_pages, no_sleep):
+    browser_calls = serve_detail_pages({"1": _detail_page("A"), "2": httpx.Response(503)})
+    failed_links = []
+    devices = list(scraper.iter_device_details(None, _detail_links(1, 2), [], 2, failed_links))
+    assert [device["device_name"] for device in devices] == ["A"]
+    assert failed_links == _detail_links(2)
+    assert browser_calls == []
+
+
+def test_browser_fallback_reports_links_when_browsers_fail(monkeypatch):
+    def no_browser():
+        raise RuntimeError("chrome failed to start")
+
+    monkeypatch.setattr(scraper, "_create_driver", no_browser)
+    failed_links = []
+    devices = scraper._scrape_detail_pages_in_browser(scraper.DriverPool(), _detail_links(1, 2, 3), 2, failed_links)
+    assert devices == []
+    assert sorted(failed_links) == _detail_links(1, 2, 3)
+
+
+@pytest.mark.parametrize("content, encoding", [
+    (b'<html><body><a href="tplc.cfm?id=1">Syr\xe9nge</a></body></html>', "iso-8859-1"),
+    (b'<html><head><meta charset="iso-8859-1"></head><body><a href="tplc.cfm?id=1">Syr\xe9nge</a></body></html>', None),
+])
+def test_parse_html_encoding_and_links(content, encoding):
+    doc = scraper._parse_html(content, DETAIL_URL, encoding)
+    link = doc.find(".//a")
+    assert link.text == "Syrénge"
+    assert link.get("href") == f"{SEARCH_URL}?id=1"